@@ -1,10 +1,11 @@
+import numbers
 import numpy as np
 import ufl
 
 from tsfc.ufl_utils import TSFCConstantMixin
 from pyop2 import op2
 from pyop2.exceptions import DataTypeError, DataValueError
-from firedrake.petsc import PETSc
+from firedrake.petsc import log_event_if_active
 from firedrake.utils import ScalarType
 from ufl.utils.counted import Counted
 
@@ -20,6 +21,11 @@ def _create_dat(op2type, value, comm):
     if op2type is op2.Global and comm is None:
         raise ValueError("Attempted to create pyop2 Global with no communicator")
 
+    if isinstance(value, numbers.Number):
+        # Fast path for the (very common) scalar case.
+        return op2type(1, np.array([value], dtype=ScalarType), comm=comm), 0, ()
+
+    # Copy so that the dat does not alias arrays owned by the caller.
     data = np.array(value, dtype=ScalarType)
     shape = data.shape
     rank = len(shape)
@@ -113,7 +119,7 @@ class Constant(ufl.constantvalue.ConstantValue, ConstantMixin, TSFCConstantMixin
     def count(self):
         return self._count
 
-    @PETSc.Log.EventDecorator()
+    @log_event_if_active()
     def evaluate(self, x, mapping, component, index_values):
         """Return the evaluation of this :class:`Constant`.
 
@@ -123,11 +129,10 @@ class Constant(ufl.constantvalue.ConstantValue, ConstantMixin, TSFCConstantMixin
              be ``None`` or ``()`` to obtain all components).
         :arg index_values: ignored.
         """
+        data = self.dat.data_ro
         if component in ((), None):
-            if self.ufl_shape == ():
-                return self.dat.data_ro[0]
-            return self.dat.data_ro
-        return self.dat.data_ro[component]
+            return data[0] if self._ufl_shape == () else data
+        return data[component]
 
     def values(self):
         """Return a (flat) view of the value of the Constant."""
@@ -164,7 +169,7 @@ class Constant(ufl.constantvalue.ConstantValue, ConstantMixin, TSFCConstantMixin
             raise RuntimeError("Can't apply boundary conditions to a Constant")
         return None
 
-    @PETSc.Log.EventDecorator()
+    @log_event_if_active()
     @ConstantMixin._ad_annotate_assign
     def assign(self, value):
         """Set the value of this constant.
@@ -1,6 +1,7 @@
 from firedrake.petsc import PETSc
 from pyop2.mpi import MPI, internal_comm, decref
 from itertools import zip_longest
+import weakref
 
 __all__ = ("Ensemble", )
 
@@ -44,7 +45,13 @@ class Ensemble(object):
         assert self.comm.size == M
         assert self.ensemble_comm.size == (size // M)
 
+        # Communicators already known to match :attr:`comm`, keyed by id.
+        # Entries go away with their communicator, so ids are not reused.
+        self._compatible_comms = weakref.WeakValueDictionary()
+
     def __del__(self):
+        if hasattr(self, "_compatible_comms"):
+            self._compatible_comms.clear()
         if hasattr(self, "comm"):
             self.comm.Free()
             del self.comm
@@ -66,28 +73,50 @@ class Ensemble(object):
         :raises ValueError: if function communicators mismatch each other or the ensemble
             spatial communicator, or is the functions are in different spaces
         """
-        if MPI.Comm.Compare(f._comm, self._comm) not in {MPI.CONGRUENT, MPI.IDENT}:
+        if not self._is_compatible_comm(f._comm):
             raise ValueError("Function communicator does not match space communicator")
 
         if g is not None:
-            if MPI.Comm.Compare(f._comm, g._comm) not in {MPI.CONGRUENT, MPI.IDENT}:
+            # Congruence is transitive, so checking g against the spatial
+            # communicator also checks it against f.
+            if not self._is_compatible_comm(g._comm):
                 raise ValueError("Mismatching communicators for functions")
             if f.function_space() != g.function_space():
                 raise ValueError("Mismatching function spaces for functions")
 
+    def _is_compatible_comm(self, comm):
+        """
+        Check if comm is congruent to the ensemble spatial communicator,
+            remembering the answer for communicators which are.
+
+        :arg comm: The communicator to check
+        """
+        if self._compatible_comms.get(id(comm)) is comm:
+            return True
+        if MPI.Comm.Compare(comm, self._comm) not in {MPI.CONGRUENT, MPI.IDENT}:
+            return False
+        self._compatible_comms[id(comm)] = comm
+        return True
+
     @PETSc.Log.EventDecorator()
     def allreduce(self, f, f_reduced, op=MPI.SUM):
         """
         Allreduce a function f into f_reduced over ``ensemble_comm`` .
 
         :arg f: The a :class:`.Function` to allreduce.
-        :arg f_reduced: the result of the reduction.
+        :arg f_reduced: the result of the reduction. May be ``f`` itself,
+            in which case the reduction is done in place.
         :arg op: MPI reduction operator. Defaults to MPI.SUM.
         :raises ValueError: if function communicators mismatch each other or the ensemble
             spatial communicator, or if the functions are in different spaces
         """
         self._check_function(f, f_reduced)
 
+        if f_reduced is f:
+            with f.dat.vec as vec:
+                self._ensemble_comm.Allreduce(MPI.IN_PLACE, vec.array, op=op)
+            return f
+
         with f_reduced.dat.vec_wo as vout, f.dat.vec_ro as vin:
             self._ensemble_comm.Allreduce(vin.array_r, vout.array, op=op)
         return f_reduced
@@ -229,6 +258,27 @@ class Ensemble(object):
         return [self._ensemble_comm.Isend(dat.data_ro, dest=dest, tag=tag)
                 for dat in f.dat]
 
+    @PETSc.Log.EventDecorator()
+    def send_init(self, f, dest, tag=0):
+        """
+        Create persistent requests to send a function f over ``ensemble_comm``
+        to another ensemble rank.
+
+        Each call to ``MPI.Prequest.Startall`` on the returned requests sends
+        the current values of f, like a call to :meth:`isend` would but without
+        setting up new requests. This is useful when the same function is
+        sent repeatedly, for example every timestep.
+
+        :arg f: The a :class:`.Function` to send
+        :arg dest: the rank to send to
+        :arg tag: the tag of the message. Defaults to 0.
+        :returns: list of MPI.Prequest objects (one for each of f.subfunctions).
+        :raises ValueError: if function communicator mismatches the ensemble spatial communicator.
+        """
+        self._check_function(f)
+        return [self._ensemble_comm.Send_init(dat.data_ro, dest=dest, tag=tag)
+                for dat in f.dat]
+
     @PETSc.Log.EventDecorator()
     def irecv(self, f, source=MPI.ANY_SOURCE, tag=MPI.ANY_TAG):
         """
@@ -1,5 +1,6 @@
 import numpy
-from functools import partial, singledispatch
+from functools import lru_cache, partial, singledispatch
+from math import prod
 import os
 import tempfile
 
@@ -57,9 +58,25 @@ def interpolate(expr, V, subset=None, access=op2.WRITE, ad_block_tag=None):
 
        If you find interpolating the same expression again and again
        (for example in a time loop) you may find you get better
-       performance by using an :class:`Interpolator` instead.
+       performance by using an :class:`Interpolator` instead. When
+       interpolating into an existing :class:`.Function` the
+       :class:`Interpolator` is cached on that function and reused
+       automatically.
 
     """
+    if (isinstance(V, firedrake.Function) and isinstance(expr, ufl.classes.Expr)
+            and all(c is V for c in extract_coefficients(expr))):
+        # Interpolating into a FunctionSpace must return a new Function each
+        # time, so there is nothing to reuse in that case. Expressions with
+        # other Functions are not cached, since the Interpolator would keep
+        # them alive, and a fresh temporary Function never hits the cache.
+        key = (expr, subset, access)
+        try:
+            interpolator = V._expression_cache[key]
+        except KeyError:
+            interpolator = Interpolator(expr, V, subset=subset, access=access)
+            V._expression_cache[key] = interpolator
+        return interpolator.interpolate(ad_block_tag=ad_block_tag)
     return Interpolator(expr, V, subset=subset, access=access).interpolate(ad_block_tag=ad_block_tag)
 
 
@@ -169,11 +186,10 @@ def make_interpolator(expr, V, subset, access, bcs=None):
             f = firedrake.Function(V)
             if access in {firedrake.MIN, firedrake.MAX}:
                 finfo = numpy.finfo(f.dat.dtype)
-                if access == firedrake.MIN:
-                    val = firedrake.Constant(finfo.max)
-                else:
-                    val = firedrake.Constant(finfo.min)
-                f.assign(val)
+                # Fill the new function directly, halos included, rather
+                # than going through a Constant and Function.assign.
+                f.dat.data_wo_with_halos[...] = finfo.max if access == firedrake.MIN else finfo.min
+                f.dat.halo_valid = True
         tensor = f.dat
     elif len(arguments) == 1:
         if isinstance(V, firedrake.Function):
@@ -213,12 +229,11 @@ def make_interpolator(expr, V, subset, access, bcs=None):
 
     # Make sure we have an expression of the right length i.e. a value for
     # each component in the value shape of each function space
-    dims = [numpy.prod(fs.ufl_element().value_shape(), dtype=int)
-            for fs in V]
+    dims = [prod(fs.ufl_element().value_shape()) for fs in V]
     loops = []
-    if numpy.prod(expr.ufl_shape, dtype=int) != sum(dims):
+    if prod(expr.ufl_shape) != sum(dims):
         raise RuntimeError('Expression of length %d required, got length %d'
-                           % (sum(dims), numpy.prod(expr.ufl_shape, dtype=int)))
+                           % (sum(dims), prod(expr.ufl_shape)))
 
     if len(V) > 1:
         raise NotImplementedError(
@@ -284,6 +299,15 @@ def _interpolator(V, tensor, expr, subset, arguments, access, bcs=None):
         # equivalent(s) (i.e. finat.point_set.UnknownPointSet(s))
         rt_var_name = 'rt_X'
         to_element = rebuild(to_element, expr, rt_var_name)
+        # Since the par_loop is over the target mesh cells we need to
+        # compose maps that take us from target mesh cells to the function
+        # space nodes on the source mesh.
+        if source_mesh.extruded:
+            # ExtrudedSet cannot be a map target so we need to build
+            # this ourselves
+            compose_with_parent = partial(vom_cell_parent_node_map_extruded, target_mesh)
+        else:
+            compose_with_parent = partial(compose_map_and_cache, target_mesh.cell_parent_cell_map)
 
     cell_set = target_mesh.cell_set
     if subset is not None:
@@ -336,7 +360,7 @@ def _interpolator(V, tensor, expr, subset, arguments, access, bcs=None):
             # vertex cell.)
             coefficients.append(target_mesh.reference_coordinates)
 
-    if tensor in set((c.dat for c in coefficients)):
+    if any(c.dat is tensor for c in coefficients):
         output = tensor
         tensor = op2.Dat(tensor.dataset)
         if access is not op2.WRITE:
@@ -357,16 +381,7 @@ def _interpolator(V, tensor, expr, subset, arguments, access, bcs=None):
         Vcol = arguments[0].function_space()
         columns_map = Vcol.cell_node_map()
         if target_mesh is not source_mesh:
-            # Since the par_loop is over the target mesh cells we need to
-            # compose a map that takes us from target mesh cells to the
-            # function space nodes on the source mesh.
-            if source_mesh.extruded:
-                # ExtrudedSet cannot be a map target so we need to build
-                # this ourselves
-                columns_map = vom_cell_parent_node_map_extruded(target_mesh, columns_map)
-            else:
-                columns_map = compose_map_and_cache(target_mesh.cell_parent_cell_map,
-                                                    columns_map)
+            columns_map = compose_with_parent(columns_map)
         lgmaps = None
         if bcs:
             bc_rows = [bc for bc in bcs if bc.function_space() == V]
@@ -381,26 +396,15 @@ def _interpolator(V, tensor, expr, subset, arguments, access, bcs=None):
         parloop_args.append(cs.dat(op2.READ, cs.cell_node_map()))
     for coefficient in coefficients:
         coeff_mesh = extract_unique_domain(coefficient)
-        if coeff_mesh is target_mesh or not coeff_mesh:
+        m_ = coefficient.cell_node_map()
+        if coeff_mesh is source_mesh and coeff_mesh is not target_mesh:
+            # m_ is allowed to be None when interpolating from a Real space,
+            # even in the trans-mesh case.
+            if m_:
+                m_ = compose_with_parent(m_)
+        elif coeff_mesh and coeff_mesh is not target_mesh:
             # NOTE: coeff_mesh is None is allowed e.g. when interpolating from
             # a Real space
-            m_ = coefficient.cell_node_map()
-        elif coeff_mesh is source_mesh:
-            if coefficient.cell_node_map():
-                # Since the par_loop is over the target mesh cells we need to
-                # compose a map that takes us from target mesh cells to the
-                # function space nodes on the source mesh.
-                if source_mesh.extruded:
-                    # ExtrudedSet cannot be a map target so we need to build
-                    # this ourselves
-                    m_ = vom_cell_parent_node_map_extruded(target_mesh, coefficient.cell_node_map())
-                else:
-                    m_ = compose_map_and_cache(target_mesh.cell_parent_cell_map, coefficient.cell_node_map())
-            else:
-                # m_ is allowed to be None when interpolating from a Real space,
-                # even in the trans-mesh case.
-                m_ = coefficient.cell_node_map()
-        else:
             raise ValueError("Have coefficient with unexpected mesh")
         parloop_args.append(coefficient.dat(op2.READ, m_))
 
@@ -463,20 +467,32 @@ def rebuild_dg(element, expr, rt_var_name):
     # but for now we just fix the values to what we know works:
     if element.degree != 0 or not isinstance(element.cell, FIAT.reference_element.Point):
         raise NotImplementedError("Cross mesh interpolation only implemented for P0DG on vertex cells.")
+    try:
+        expr_cell = expr.ufl_element().cell()
+    except AttributeError:
+        # expression must be pure function of spatial coordinates so
+        # domain has correct ufl cell
+        expr_cell = extract_unique_domain(expr).ufl_cell()
+    return _runtime_point_evaluation_element(expr_cell, expr_tdim, rt_var_name)
+
+
+@lru_cache()
+def _runtime_point_evaluation_element(expr_cell, expr_tdim, rt_var_name):
+    """Return a single point :class:`finat.QuadratureElement` on the
+    reference cell of ``expr_cell`` whose point is tabulated at runtime from
+    the kernel argument ``rt_var_name``.
+
+    This only depends on its (hashable) arguments, so is cached to avoid
+    rebuilding the FIAT cell and quadrature rule for every interpolator.
+    """
     num_points = 1
     weights = [1.]*num_points
     # gem.Variable name starting with rt_ forces TSFC runtime tabulation
     assert rt_var_name.startswith("rt_")
     runtime_points_expr = gem.Variable(rt_var_name, (num_points, expr_tdim))
     rule_pointset = finat.point_set.UnknownPointSet(runtime_points_expr)
-    try:
-        expr_fiat_cell = as_fiat_cell(expr.ufl_element().cell())
-    except AttributeError:
-        # expression must be pure function of spatial coordinates so
-        # domain has correct ufl cell
-        expr_fiat_cell = as_fiat_cell(extract_unique_domain(expr).ufl_cell())
     rule = finat.quadrature.QuadratureRule(rule_pointset, weights=weights)
-    return finat.QuadratureElement(expr_fiat_cell, rule)
+    return finat.QuadratureElement(as_fiat_cell(expr_cell), rule)
 
 
 @rebuild.register(finat.TensorFiniteElement)
@@ -500,7 +516,8 @@ def compose_map_and_cache(map1, map2):
 
     :returns:  The composed map
     """
-    cache_key = hash((map2, "composed"))
+    # Key on map2 itself rather than on its hash, which can collide.
+    cache_key = (map2, "composed")
     try:
         cmap = map1._cache[cache_key]
     except KeyError:
@@ -609,23 +626,33 @@ def vom_cell_parent_node_map_extruded(vertex_only_mesh, extruded_cell_node_map):
     information we use the above to work out the corresponding DoFs/nodes on
     the parent extruded mesh.
 
+    The resulting map is cached on ``extruded_cell_node_map``.
+
     """
     if not isinstance(vertex_only_mesh.topology, firedrake.mesh.VertexOnlyMeshTopology):
         raise TypeError("The input mesh must be a VertexOnlyMesh")
     cnm = extruded_cell_node_map
     vmx = vertex_only_mesh
+    cache_key = ("vom_cell_parent_node_map_extruded", vmx.cell_set)
+    try:
+        return cnm._cache[cache_key]
+    except KeyError:
+        pass
     dofs_per_target_cell = cnm.arity
     base_cells = vmx.cell_parent_base_cell_list
     heights = vmx.cell_parent_extrusion_height_list
     assert cnm.values.shape[1] == dofs_per_target_cell
     assert len(cnm.offset) == dofs_per_target_cell
-    target_cell_parent_node_list = [
-        cnm.values[base_cell, :] + height * cnm.offset[:]
-        for base_cell, height in zip(base_cells, heights)
-    ]
-    return op2.Map(
+    # Build the contiguous (ncells, arity) values array directly in the map
+    # dtype so that op2.Map can use it without another copy.
+    target_cell_parent_node_list = numpy.multiply(heights[:, numpy.newaxis], cnm.offset[numpy.newaxis, :],
+                                                  dtype=utils.IntType)
+    target_cell_parent_node_list += cnm.values[base_cells, :]
+    vmx_map = op2.Map(
         vmx.cell_set, cnm.toset, dofs_per_target_cell, target_cell_parent_node_list
     )
+    cnm._cache[cache_key] = vmx_map
+    return vmx_map
 
 
 class GlobalWrapper(object):
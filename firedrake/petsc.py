@@ -96,6 +96,29 @@ def get_petsc_variables():
     return {k.strip(): v.strip() for k, v in splitlines}
 
 
+def log_event_if_active(name=None):
+    """Return a decorator which logs a :class:`PETSc.Log.EventDecorator`
+    event only while PETSc logging is active.
+
+    This is intended for small, frequently called functions where the event
+    wrapper is a noticeable share of the cost. Whether logging is active is
+    checked on each call, so logging started after import (e.g. with
+    ``PETSc.Log.begin()``) is still recorded.
+
+    :arg name: The event name, defaults to the name of the decorated function.
+    """
+    def decorator(func):
+        logged = PETSc.Log.EventDecorator(name)(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if PETSc.Log.isActive():
+                return logged(*args, **kwargs)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def _get_dependencies(filename):
     """Get all the dependencies of a shared object library"""
     # Linux uses `ldd` to look at shared library linkage, MacOS uses `otool`
@@ -2,14 +2,6 @@ import enum
 import math
 import numpy as np
 import numpy.random as randomgen
-import matplotlib.pyplot as plt
-import matplotlib.colors
-import matplotlib.patches
-import matplotlib.tri
-from matplotlib.path import Path
-from matplotlib.collections import LineCollection, PolyCollection
-import mpl_toolkits.mplot3d
-from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
 from math import factorial
 from firedrake import (interpolate, sqrt, inner, Function, SpatialCoordinate,
                        FunctionSpace, VectorFunctionSpace, PointNotInDomainError,
@@ -25,6 +17,9 @@ __all__ = ["plot", "triplot", "tricontourf", "tricontour", "trisurf", "tripcolor
            "quiver", "streamplot", "FunctionPlotter",
            "pgfplot"]
 
+# matplotlib is slow to import, so it is only imported by the functions that
+# need it rather than when firedrake is imported.
+
 
 def toreal(array, component):
     if array.dtype.kind == "c":
@@ -36,6 +31,7 @@ def toreal(array, component):
 
 
 def _autoscale_view(axes, coords):
+    import mpl_toolkits.mplot3d
     axes.autoscale_view()
 
     if coords is not None:
@@ -60,6 +56,8 @@ def _autoscale_view(axes, coords):
 
 
 def _get_collection_types(gdim, tdim):
+    from matplotlib.collections import LineCollection, PolyCollection
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
     if gdim == 2:
         if tdim == 1:
             # Probably a CircleCollection?
@@ -94,6 +92,11 @@ def triplot(mesh, axes=None, interior_kw={}, boundary_kw={}):
     :arg boundary_kw: keyword arguments to apply when plotting the mesh boundary
     :return: list of matplotlib :class:`Collection <matplotlib.collections.Collection>` objects
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.colors
+    from matplotlib.collections import PolyCollection
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
     gdim = mesh.geometric_dimension()
     tdim = mesh.topological_dimension()
     BoundaryCollection, InteriorCollection = _get_collection_types(gdim, tdim)
@@ -191,6 +194,7 @@ def triplot(mesh, axes=None, interior_kw={}, boundary_kw={}):
 
 
 def _plot_2d_field(method_name, function, *args, complex_component="real", **kwargs):
+    import matplotlib.pyplot as plt
     axes = kwargs.pop("axes", None)
     if axes is None:
         figure = plt.figure()
@@ -264,6 +268,7 @@ def tripcolor(function, *args, complex_component="real", **kwargs):
 
 
 def _trisurf_3d(axes, function, *args, complex_component="real", vmin=None, vmax=None, norm=None, **kwargs):
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
     num_sample_points = kwargs.pop("num_sample_points", 10)
     function_plotter = FunctionPlotter(function.function_space().mesh(), num_sample_points)
     coordinates, triangles = function_plotter.coordinates, function_plotter.triangles
@@ -297,6 +302,9 @@ def trisurf(function, *args, complex_component="real", **kwargs):
     :arg kwargs: same as for matplotlib
     :return: matplotlib :class:`Poly3DCollection <mpl_toolkits.mplot3d.art3d.Poly3DCollection>` object
     """
+    import matplotlib.pyplot as plt
+    import mpl_toolkits.mplot3d  # noqa: F401
+
     axes = kwargs.pop("axes", None)
     if axes is None:
         figure = plt.figure()
@@ -333,6 +341,8 @@ def quiver(function, *, complex_component="real", **kwargs):
     :arg kwargs: same as for matplotlib :func:`quiver <matplotlib.pyplot.quiver>`
     :return: matplotlib :class:`Quiver <matplotlib.quiver.Quiver>` object
     """
+    import matplotlib.pyplot as plt
+
     if function.ufl_shape != (2,):
         raise ValueError("Quiver plots only defined for 2D vector fields!")
 
@@ -591,6 +601,10 @@ def streamplot(function, resolution=None, min_length=None, max_time=None,
         component? (``'real'`` or ``'imag'``). Default is ``'real'``.
     :kwarg kwargs: same as for matplotlib :class:`~matplotlib.collections.LineCollection`
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.colors
+    from matplotlib.collections import LineCollection
+
     if function.ufl_shape != (2,):
         raise ValueError("Streamplot only defined for 2D vector fields!")
 
@@ -679,6 +693,8 @@ def plot(function, *args, bezier=False, num_sample_points=10, complex_component=
     :arg kwargs: same as for matplotlib
     :return: list of matplotlib :class:`Line2D <matplotlib.lines.Line2D>`
     """
+    import matplotlib.pyplot as plt
+
     if isinstance(function, MeshGeometry):
         raise TypeError("Expected Function, not Mesh; see firedrake.triplot")
 
@@ -742,6 +758,9 @@ def _bezier_plot(function, axes, complex_component="real", **kwargs):
     :arg kwargs: additional key work arguments to plot
     :return: matplotlib :class:`PathPatch <matplotlib.patches.PathPatch>`
     """
+    import matplotlib.patches
+    from matplotlib.path import Path
+
     deg = function.function_space().ufl_element().degree()
     mesh = function.function_space().mesh()
     if deg == 0:
@@ -779,6 +798,9 @@ def _interp_bezier(pts, num_cells, axes, complex_component="real", **kwargs):
         component? (``'real'`` or ``'imag'``). Default is ``'real'``.
     :arg kwargs: Addition key word argument for plotting
     """
+    import matplotlib.patches
+    from matplotlib.path import Path
+
     pts = pts.T.reshape(num_cells, -1, 2)
     vertices = np.array([]).reshape(-1, 2)
     rows = np.arange(4)
@@ -820,6 +842,8 @@ class FunctionPlotter:
         self._reference_points = np.linspace(0.0, 1.0, num_sample_points).reshape(-1, 1)
 
     def _setup_nd(self, mesh, num_sample_points):
+        import matplotlib.tri
+
         cell_name = mesh.ufl_cell().cellname()
         if cell_name == "triangle":
             x = np.array([0, 0, 1])
@@ -11,7 +11,7 @@ from firedrake.formmanipulation import ExtractSubBlock
 from firedrake.function import Function
 from firedrake.functionspace import FunctionSpace
 from firedrake.ufl_expr import TestFunction, TestFunctions, TrialFunctions
-from firedrake.utils import cached_property
+from firedrake.utils import IntType, as_ctypes, cached_property
 from firedrake_citations import Citations
 from ufl.algorithms.ad import expand_derivatives
 from ufl.algorithms.expand_indices import expand_indices
@@ -240,6 +240,7 @@ class FDMPC(PCBase):
         self.lgmaps = {Vsub: Vsub.local_to_global_map([bc for bc in bcs if bc.function_space() == Vsub]) for Vsub in V}
         self.coefficients, assembly_callables = self.assemble_coefficients(J, fcp)
         self.assemblers = {}
+        self._index_cache = {}
 
         Pmats = {}
         addv = PETSc.InsertMode.ADD_VALUES
@@ -499,16 +500,14 @@ class FDMPC(PCBase):
                 isperm.destroy()
             return cache.setdefault(key, result)
 
-        short_key = key[:-3] + (False,) * 3
+        full_key = key[:-4] + (False,) * 4
         try:
-            result = cache[short_key]
+            result = cache[full_key]
         except KeyError:
             # Get CG(k) and DG(k-1) 1D elements from V
             elements = sorted(get_base_elements(fe), key=lambda e: e.formdegree)
             e0 = elements[0] if elements[0].formdegree == 0 else None
             e1 = elements[-1] if elements[-1].formdegree == 1 else None
-            if e0 and is_interior:
-                e0 = FIAT.RestrictedElement(e0, restriction_domain="interior")
 
             # Get broken(CG(k)) and DG(k-1) 1D elements from the coefficient spaces
             Q0 = self.coefficients["beta"].function_space().finat_element.element
@@ -537,10 +536,19 @@ class FDMPC(PCBase):
                 result = temp.kron(eye)
                 temp.destroy()
                 eye.destroy()
+            cache[full_key] = result
 
         if is_facet:
-            cache[short_key] = result
             result = get_submat(result, iscol=self.fises)
+        elif is_interior:
+            # Restrict the unrestricted tensor onto the interior DOFs
+            e = unrestrict_element(V.ufl_element())
+            if isinstance(e, (ufl.VectorElement, ufl.TensorElement)):
+                e = e._sub_element
+            idofs = restricted_dofs(fe, create_element(e))
+            iises = PETSc.IS().createBlock(value_size, idofs, comm=PETSc.COMM_SELF)
+            result = get_submat(result, iscol=iises)
+            iises.destroy()
         return cache.setdefault(key, result)
 
     @cached_property
@@ -620,21 +628,6 @@ class SparseAssembler(object):
 
     def __init__(self, kernel, Vrow, Vcol, rmap, cmap):
         self.kernel = kernel
-        m, n = kernel.result.getSize()
-
-        spaces = [Vrow]
-        row_shape = tuple() if Vrow.value_size == 1 else (Vrow.value_size,)
-        map_rows = (self.map_block_indices, rmap) if row_shape else (rmap.apply,)
-        rows = numpy.empty((m, ), dtype=PETSc.IntType).reshape((-1,) + row_shape)
-        if Vcol == Vrow:
-            cols = rows
-            map_cols = (lambda *args, result=None: result, )
-        else:
-            spaces.append(Vcol)
-            col_shape = tuple() if Vcol.value_size == 1 else (Vcol.value_size,)
-            map_cols = (self.map_block_indices, cmap) if col_shape else (cmap.apply, )
-            cols = numpy.empty((n, ), dtype=PETSc.IntType).reshape((-1,) + col_shape)
-        spaces.extend(c.function_space() for c in kernel.coefficients)
 
         integral_type = kernel.integral_type
         if integral_type in ["cell", "interior_facet_horiz"]:
@@ -643,71 +636,43 @@ class SparseAssembler(object):
             get_map = operator.methodcaller("interior_facet_node_map")
         else:
             raise NotImplementedError("Only for cell or interior facet integrals")
-        self.node_maps = tuple(map(get_map, spaces))
-
-        ncell = 2 if integral_type.startswith("interior_facet") else 1
-        self.indices = tuple(numpy.empty((V.finat_element.space_dimension() * ncell,), dtype=PETSc.IntType) for V in spaces)
-        self.map_rows = partial(*map_rows, self.indices[spaces.index(Vrow)], result=rows)
-        self.map_cols = partial(*map_cols, self.indices[spaces.index(Vcol)], result=cols)
-        self.kernel_args = self.indices[-len(kernel.coefficients):]
-        self.set_indices = self.copy_indices
-
-        node_map = self.node_maps[0]
-        self.nel = node_map.values.shape[0]
-        if node_map.offset is None:
-            layers = None
+        horiz = integral_type.endswith("horiz")
+
+        # Tabulate the indices once, so that each assembly only needs to slice these tables
+        spaces = [c.function_space() for c in kernel.coefficients]
+        self.coefficient_indices = tuple(tabulate_node_map(get_map(V), horiz=horiz) for V in spaces)
+        self.rows = self.tabulate_global_indices(get_map(Vrow), Vrow.value_size, rmap, horiz)
+        if Vcol == Vrow:
+            self.cols = self.rows
         else:
-            layers = node_map.iterset.layers_array
-            layers = layers[:, 1]-layers[:, 0]-1
-            if integral_type.endswith("horiz"):
-                layers -= 1
-                self.set_indices = self.copy_indices_horiz
-            if layers.shape[0] != self.nel:
-                layers = numpy.repeat(layers, self.nel)
-        self.layers = layers
-
-    def map_block_indices(self, lgmap, indices, result=None):
-        bsize = result.shape[-1]
-        numpy.copyto(result[:, 0], indices)
-        result[:, 0] *= bsize
-        numpy.add.outer(result[:, 0], numpy.arange(1, bsize, dtype=indices.dtype), out=result[:, 1:])
-        return lgmap.apply(result, result=result)
-
-    def copy_indices_horiz(self, e):
-        for index, node_map in zip(self.indices, self.node_maps):
-            index = index.reshape((2, -1))
-            numpy.copyto(index, node_map.values_with_halo[e])
-            index[1] += node_map.offset
-
-    def copy_indices(self, e):
-        for index, node_map in zip(self.indices, self.node_maps):
-            numpy.copyto(index, node_map.values_with_halo[e])
-
-    def add_offsets(self):
-        for index, node_map in zip(self.indices, self.node_maps):
-            index += node_map.offset
+            self.cols = self.tabulate_global_indices(get_map(Vcol), Vcol.value_size, cmap, horiz)
+        self.nel = self.rows.shape[0]
+
+    @staticmethod
+    def tabulate_global_indices(node_map, bsize, lgmap, horiz=False):
+        indices = tabulate_node_map(node_map, bsize=bsize, horiz=horiz)
+        return lgmap.apply(indices).reshape(indices.shape)
 
     def assemble(self, A, addv=None, triu=False):
-        if A.getType() == PETSc.Mat.Type.PREALLOCATOR:
-            kernel = lambda *args, result=None: result
-        else:
-            kernel = self.kernel
-        result = self.kernel.result
+        kernel = self.kernel
+        result = kernel.result
         insert = self.setSubMatCSR(PETSc.COMM_SELF, triu=triu)
+        if A.getType() == PETSc.Mat.Type.PREALLOCATOR:
+            # Only the sparsity pattern is needed, insert it on all cells at once
+            insert(A, result, self.rows, self.cols, addv, nel=self.nel)
+            return
+        if not kernel.coefficients:
+            # The element matrix does not depend on the cell, insert it on all cells at once
+            insert(A, kernel(result=result), self.rows, self.cols, addv, nel=self.nel)
+            return
+
+        # Gather the coefficients on all cells at once
+        coefficients = tuple(c.dat.data_ro[indices] for c, indices in zip(kernel.coefficients, self.coefficient_indices))
 
         # Core assembly loop
-        if self.layers is None:
-            for e in range(self.nel):
-                self.set_indices(e)
-                insert(A, kernel(*self.kernel_args, result=result),
-                       self.map_rows(), self.map_cols(), addv)
-        else:
-            for e in range(self.nel):
-                self.set_indices(e)
-                for _ in range(self.layers[e]):
-                    insert(A, kernel(*self.kernel_args, result=result),
-                           self.map_rows(), self.map_cols(), addv)
-                    self.add_offsets()
+        for e in range(self.nel):
+            insert(A, kernel(*(data[e] for data in coefficients), result=result),
+                   self.rows[e], self.cols[e], addv)
 
 
 class ElementKernel(object):
@@ -758,9 +723,9 @@ class TripleProductKernel(ElementKernel):
         self.product = partial(A.matMatMult, B, C)
         super().__init__(self.product(), *coefficients)
 
-    def __call__(self, *indices, result=None):
-        for c, i, z in zip(self.coefficients, indices, self.slices):
-            numpy.take(c.dat.data_ro, i, axis=0, out=self.data[z])
+    def __call__(self, *args, result=None):
+        for data, z in zip(args, self.slices):
+            numpy.copyto(self.data[z], data)
         self.update()
         return self.product(result=result)
 
@@ -991,8 +956,9 @@ def load_c_code(code, name, **kwargs):
 
 
 def load_setSubMatCSR(comm, triu=False):
-    """Insert one sparse matrix into another sparse matrix.
-       Done in C for efficiency, since it loops over rows."""
+    """Insert one sparse matrix into another sparse matrix, optionally on
+       several cells with the same sparse matrix and different indices.
+       Done in C for efficiency, since it loops over rows and cells."""
     if triu:
         name = "setSubMatCSR_SBAIJ"
         select_cols = "icol -= (icol < irow) * (1 + icol);"
@@ -1004,6 +970,7 @@ def load_setSubMatCSR(comm, triu=False):
 
 PetscErrorCode {name}(Mat A,
                       Mat B,
+                      PetscInt nel,
                       PetscInt *rindices,
                       PetscInt *cindices,
                       InsertMode addv)
@@ -1015,38 +982,34 @@ PetscErrorCode {name}(Mat A,
     PetscInt m, n;
     PetscErrorCode ierr;
     PetscFunctionBeginUser;
-    MatGetSize(B, &m, NULL);
-
-    n = 0;
-    for (PetscInt i = 0; i < m; i++) {{
-        ierr = MatGetRow(B, i, &ncols, NULL, NULL);CHKERRQ(ierr);
-        n = ncols > n ? ncols : n;
-        ierr = MatRestoreRow(B, i, &ncols, NULL, NULL);CHKERRQ(ierr);
-    }}
+    // The number of columns of B bounds the number of nonzeros in any row
+    MatGetSize(B, &m, &n);
     PetscMalloc1(n, &indices);
     for (PetscInt i = 0; i < m; i++) {{
         ierr = MatGetRow(B, i, &ncols, &cols, &vals);CHKERRQ(ierr);
-        irow = rindices[i];
-        for (PetscInt j = 0; j < ncols; j++) {{
-            icol = cindices[cols[j]];
-            {select_cols}
-            indices[j] = icol;
+        for (PetscInt e = 0; e < nel; e++) {{
+            irow = rindices[e*m + i];
+            for (PetscInt j = 0; j < ncols; j++) {{
+                icol = cindices[e*n + cols[j]];
+                {select_cols}
+                indices[j] = icol;
+            }}
+            ierr = MatSetValues(A, 1, &irow, ncols, indices, vals, addv);CHKERRQ(ierr);
         }}
-        ierr = MatSetValues(A, 1, &irow, ncols, indices, vals, addv);CHKERRQ(ierr);
         ierr = MatRestoreRow(B, i, &ncols, &cols, &vals);CHKERRQ(ierr);
     }}
     PetscFree(indices);
     PetscFunctionReturn(0);
 }}
 """
-    argtypes = [ctypes.c_voidp, ctypes.c_voidp,
+    argtypes = [ctypes.c_voidp, ctypes.c_voidp, as_ctypes(IntType),
                 ctypes.c_voidp, ctypes.c_voidp, ctypes.c_int]
     funptr = load_c_code(code, name, comm=comm, argtypes=argtypes,
                          restype=ctypes.c_int)
 
     @PETSc.Log.EventDecorator(name)
-    def wrapper(A, B, rows, cols, addv):
-        return funptr(A.handle, B.handle, rows.ctypes.data, cols.ctypes.data, addv)
+    def wrapper(A, B, rows, cols, addv, nel=1):
+        return funptr(A.handle, B.handle, nel, rows.ctypes.data, cols.ctypes.data, addv)
 
     return wrapper
 
@@ -1064,15 +1027,13 @@ def petsc_sparse(A_numpy, rtol=1E-10, comm=None):
     """Convert dense numpy matrix into a sparse PETSc matrix"""
     atol = rtol * abs(max(A_numpy.min(), A_numpy.max(), key=abs))
     sparsity = abs(A_numpy) > atol
-    nnz = numpy.count_nonzero(sparsity, axis=1).astype(PETSc.IntType)
-    A = PETSc.Mat().createAIJ(A_numpy.shape, nnz=(nnz, 0), comm=comm)
-    rows, cols = numpy.nonzero(sparsity)
-    rows = rows.astype(PETSc.IntType)
-    cols = cols.astype(PETSc.IntType)
-    vals = A_numpy[sparsity]
-    A.setValuesRCV(rows[:, None], cols[:, None], vals[:, None], PETSc.InsertMode.INSERT)
-    A.assemble()
-    return A
+    nnz = numpy.count_nonzero(sparsity, axis=1)
+    indptr = numpy.zeros((A_numpy.shape[0]+1,), dtype=PETSc.IntType)
+    numpy.cumsum(nnz, out=indptr[1:])
+    _, indices = numpy.nonzero(sparsity)
+    indices = indices.astype(PETSc.IntType)
+    data = A_numpy[sparsity]
+    return PETSc.Mat().createAIJ(A_numpy.shape, csr=(indptr, indices, data), comm=comm)
 
 
 def kron3(A, B, C, scale=None):
@@ -1371,14 +1332,6 @@ class PoissonFDMPC(FDMPC):
         update_A = lambda A, Ae, rindices: set_submat(A, Ae, rindices, rindices, addv)
         condense_element_mat = lambda x: x
 
-        def cell_to_global(lgmap, cell_to_local, cell_index, result=None):
-            # Be careful not to create new arrays
-            result = cell_to_local(cell_index, result=result)
-            return lgmap.apply(result, result=result)
-
-        bsize = Vrow.dof_dset.layout_vec.getBlockSize()
-        cell_to_local, nel = extrude_node_map(Vrow.cell_node_map(), bsize=bsize)
-        get_rindices = partial(cell_to_global, self.lgmaps[Vrow], cell_to_local)
         Afdm, Dfdm, bdof, axes_shifts = self.assemble_reference_tensor(Vrow)
 
         Gq = self.coefficients.get("alpha")
@@ -1387,6 +1340,18 @@ class PoissonFDMPC(FDMPC):
         Gq_facet = self.coefficients.get("Gq_facet")
         PT_facet = self.coefficients.get("PT_facet")
 
+        # the cell-to-node tables only depend on the spaces, tabulate them once
+        key = (Vrow.ufl_element(), Vcol.ufl_element())
+        try:
+            cell_to_global, index_coef, index_bc = self._index_cache[key]
+        except KeyError:
+            bsize = Vrow.dof_dset.layout_vec.getBlockSize()
+            cell_to_global = SparseAssembler.tabulate_global_indices(Vrow.cell_node_map(), bsize, self.lgmaps[Vrow])
+            index_coef = tabulate_node_map((Gq or Bq).cell_node_map())
+            index_bc = tabulate_node_map(bcflags.cell_node_map())
+            self._index_cache.setdefault(key, (cell_to_global, index_coef, index_bc))
+        nel = cell_to_global.shape[0]
+
         V = Vrow
         bsize = V.value_size
         ncomp = V.ufl_element().reference_value_size()
@@ -1394,8 +1359,6 @@ class PoissonFDMPC(FDMPC):
         tdim = V.mesh().topological_dimension()
         shift = axes_shifts * bsize
 
-        index_coef, _ = extrude_node_map((Gq or Bq).cell_node_map())
-        index_bc, _ = extrude_node_map(bcflags.cell_node_map())
         flag2id = numpy.kron(numpy.eye(tdim, tdim, dtype=PETSc.IntType), [[1], [2]])
 
         # pshape is the shape of the DOFs in the tensor product
@@ -1412,7 +1375,6 @@ class PoissonFDMPC(FDMPC):
         # I cannot do this for hdiv elements as off-diagonals are not sparse, this is because
         # the FDM eigenbases for CG(k) and CG(k-1) are not orthogonal to each other
         use_diag_Bq = Bq is None or len(Bq.ufl_shape) != 2 or static_condensation
-        rindices = None
         if not use_diag_Bq:
             bshape = Bq.ufl_shape
             # Be = Bhat kron ... kron Bhat
@@ -1424,10 +1386,10 @@ class PoissonFDMPC(FDMPC):
             aidx = numpy.tile(numpy.arange(bshape[1], dtype=PETSc.IntType), bshape[0])
             for e in range(nel):
                 # Ae = Be kron Bq[e]
-                adata = numpy.sum(Bq.dat.data_ro[index_coef(e)], axis=0)
+                adata = numpy.sum(Bq.dat.data_ro[index_coef[e]], axis=0)
                 Ae = PETSc.Mat().createAIJWithArrays(bshape, (aptr, aidx, adata), comm=PETSc.COMM_SELF)
                 Ae = Be.kron(Ae)
-                rindices = get_rindices(e, result=rindices)
+                rindices = cell_to_global[e]
                 update_A(A, Ae, rindices)
                 Ae.destroy()
             Be.destroy()
@@ -1435,19 +1397,61 @@ class PoissonFDMPC(FDMPC):
 
         # assemble the second order term and the zero-th order term if any,
         # discarding mixed derivatives and mixed components
-        ae = numpy.zeros((ncomp, tdim), dtype=PETSc.RealType)
-        be = numpy.zeros((ncomp,), dtype=PETSc.RealType)
-        je = None
+        coefs = numpy.zeros((ncomp, tdim+1), dtype=PETSc.RealType)
+        iterms = ([] if Gq is None else list(range(tdim))) + ([] if Bq is None else [tdim])
+
+        # The element matrix only depends on the cell through the coefficients and
+        # the BC flags, so we cache the Kronecker products of the interval matrices
+        # Ae = ae[k][0] Ahat kron Bhat kron Bhat + ... + be[k] Bhat kron Bhat kron Bhat
+        element_mats = {}
+
+        def get_element_mat(axes, fbc):
+            key = (tuple(axes), tuple(fbc))
+            try:
+                return element_mats[key]
+            except KeyError:
+                pass
+            terms = []
+            for m in iterms:
+                factors = [Afdm[axes[i]][1+fbc[i] if i == m else 0] for i in range(tdim)]
+                term = factors[0].copy()
+                for factor in factors[1:]:
+                    temp = term
+                    term = temp.kron(factor)
+                    temp.destroy()
+                terms.append(term)
+
+            # Tabulate the values of each term on the union of their sparsity patterns
+            Ae = terms[0].copy()
+            for term in terms[1:]:
+                Ae.axpy(1.0, term)
+            indptr, indices, _ = Ae.getValuesCSR()
+            data = numpy.zeros((len(terms), len(indices)), dtype=PETSc.ScalarType)
+            work = Ae.duplicate(copy=False)
+            for term, values in zip(terms, data):
+                work.zeroEntries()
+                work.axpy(1.0, term, structure=PETSc.Mat.Structure.SUBSET_NONZERO_PATTERN)
+                numpy.copyto(values, work.getValuesCSR()[2])
+                term.destroy()
+            work.destroy()
+            return element_mats.setdefault(key, (Ae, indptr, indices, data))
+
+        # gather the coefficients and BC flags on all cells at once
+        if Gq is not None:
+            Gcells = numpy.sum(Gq.dat.data_ro[index_coef], axis=1)
+        if Bq is not None:
+            Bcells = numpy.sum(Bq.dat.data_ro[index_coef], axis=1)
+        bcells = bcflags.dat.data_ro_with_halos[index_bc] > 1E-8
+
         for e in range(nel):
-            je = index_coef(e, result=je)
-            bce = bcflags.dat.data_ro_with_halos[index_bc(e)] > 1E-8
+            bce = bcells[e]
             # get coefficients on this cell
             if Gq is not None:
-                ae[:] = numpy.sum(Gq.dat.data_ro[je], axis=0)
+                coefs[:, :tdim] = Gcells[e]
             if Bq is not None:
-                be[:] = numpy.sum(Bq.dat.data_ro[je], axis=0)
+                coefs[:, tdim] = Bcells[e]
 
-            rindices = get_rindices(e, result=rindices)
+            rindices = cell_to_global[e]
             rows = numpy.reshape(rindices, (-1, bsize))
             rows = numpy.transpose(rows)
             rows = numpy.reshape(rows, (ncomp, -1))
@@ -1458,37 +1462,15 @@ class PoissonFDMPC(FDMPC):
                 bck = bce[:, k] if len(bce.shape) == 2 else bce
                 fbc = numpy.dot(bck, flag2id)
 
-                if Gq is not None:
-                    # Ae = ae[k][0] Ahat + be[k] Bhat
-                    Be = Afdm[axes[0]][0].copy()
-                    Ae = Afdm[axes[0]][1+fbc[0]].copy()
-                    Ae.scale(ae[k][0])
-                    if Bq is not None:
-                        Ae.axpy(be[k], Be)
-
-                    if tdim > 1:
-                        # Ae = Ae kron Bhat + ae[k][1] Bhat kron Ahat
-                        Ae = Ae.kron(Afdm[axes[1]][0])
-                        if Gq is not None:
-                            Ae.axpy(ae[k][1], Be.kron(Afdm[axes[1]][1+fbc[1]]))
-
-                        if tdim > 2:
-                            # Ae = Ae kron Bhat + ae[k][2] Bhat kron Bhat kron Ahat
-                            Be = Be.kron(Afdm[axes[1]][0])
-                            Ae = Ae.kron(Afdm[axes[2]][0])
-                            if Gq is not None:
-                                Ae.axpy(ae[k][2], Be.kron(Afdm[axes[2]][1+fbc[2]]))
-                    Be.destroy()
-
-                elif Bq is not None:
-                    Ae = Afdm[axes[0]][0]
-                    for m in range(1, tdim):
-                        Ae = Ae.kron(Afdm[axes[m]][0])
-                    Ae.scale(be[k])
+                Ae, indptr, indices, data = get_element_mat(axes, fbc)
+                Ae.setValuesCSR(indptr, indices, numpy.dot(coefs[k, iterms], data))
+                Ae.assemble()
 
                 Ae = condense_element_mat(Ae)
                 update_A(A, Ae, rows[k].astype(PETSc.IntType))
-                Ae.destroy()
+
+        for Ae, *_ in element_mats.values():
+            Ae.destroy()
 
         # assemble SIPG interior facet terms if the normal derivatives have been set up
         if any(Dk is not None for Dk in Dfdm):
@@ -1503,15 +1485,20 @@ class PoissonFDMPC(FDMPC):
             index_coef, _, _ = extrude_interior_facet_maps(Gq_facet or Gq)
             rows = numpy.zeros((2, sdim), dtype=PETSc.IntType)
 
+            # apply the lgmap to all components on all facets at once
+            ibase = numpy.arange(bsize, dtype=PETSc.IntType)
+            index_facet = numpy.add.outer(bsize*index_facet[:nfacets], ibase)
+            index_facet = numpy.reshape(lgmap.apply(index_facet), (nfacets, 2, -1, bsize))
+
             for e in range(nfacets):
                 # for each interior facet: compute the SIPG stiffness matrix Ae
-                ie = index_facet(e)
-                je = numpy.reshape(index_coef(e), (2, -1))
-                lfd = local_facet_data(e)
+                icells = index_facet[e]
+                je = numpy.reshape(index_coef[e], (2, -1))
+                lfd = local_facet_data[e]
                 idir = lfd // 2
 
                 if PT_facet:
-                    icell = numpy.reshape(lgmap.apply(ie), (2, ncomp, -1))
+                    icell = numpy.reshape(icells, (2, ncomp, -1))
                     iord0 = numpy.insert(numpy.delete(numpy.arange(tdim), idir[0]), 0, idir[0])
                     iord1 = numpy.insert(numpy.delete(numpy.arange(tdim), idir[1]), 0, idir[1])
                     je = je[[0, 1], lfd]
@@ -1570,7 +1557,7 @@ class PoissonFDMPC(FDMPC):
                             Ae = Ae.kron(Afdm[axes[2]][0])
 
                     if bsize == ncomp:
-                        icell = numpy.reshape(lgmap.apply(k+bsize*ie), (2, -1))
+                        icell = icells[:, :, k]
                         rows[0] = pull_axis(icell[0], pshape, idir[0])
                         rows[1] = pull_axis(icell[1], pshape, idir[1])
                     else:
@@ -1605,6 +1592,8 @@ class PoissonFDMPC(FDMPC):
 
         # extract coefficients directly from the bilinear form
         integrals_J = J.integrals_by_type("cell")
+        # differentiate the summed cell integrand once instead of each integral separately
+        integrand_J = sum(i.integrand() for i in integrals_J)
         mapping = args_J[0].ufl_element().mapping().lower()
         Piola = get_piola_tensor(mapping, mesh)
 
@@ -1614,8 +1603,8 @@ class PoissonFDMPC(FDMPC):
             replace_grad = {ufl.grad(t): ufl.dot(Piola, ufl.dot(dt, Finv)) for t, dt in zip(args_J, ref_grad)}
         else:
             replace_grad = {ufl.grad(t): ufl.dot(dt, Finv) for t, dt in zip(args_J, ref_grad)}
-        alpha = expand_derivatives(sum([ufl.diff(ufl.diff(ufl.replace(i.integrand(), replace_grad),
-                                                 ref_grad[0]), ref_grad[1]) for i in integrals_J]))
+        alpha = expand_derivatives(ufl.diff(ufl.diff(ufl.replace(integrand_J, replace_grad),
+                                                     ref_grad[0]), ref_grad[1]))
         # discard mixed derivatives and mixed components
         if len(alpha.ufl_shape) == 2:
             alpha = ufl.diag_vector(alpha)
@@ -1639,8 +1628,8 @@ class PoissonFDMPC(FDMPC):
             replace_val = {t: ufl.dot(dummy_Piola, s) for t, s in zip(args_J, ref_val)}
         else:
             replace_val = {t: s for t, s in zip(args_J, ref_val)}
-        beta = expand_derivatives(sum(ufl.diff(ufl.diff(ufl.replace(i.integrand(), replace_val),
-                                               ref_val[0]), ref_val[1]) for i in integrals_J))
+        beta = expand_derivatives(ufl.diff(ufl.diff(ufl.replace(integrand_J, replace_val),
+                                                    ref_val[0]), ref_val[1]))
         if Piola:
             beta = ufl.replace(beta, {dummy_Piola: Piola})
         # assemble zero-th order coefficient
@@ -1665,20 +1654,21 @@ class PoissonFDMPC(FDMPC):
             ifacet_inner = lambda v, u: ((ufl.inner(v('+'), u('+')) + ufl.inner(v('-'), u('-')))/area)*dS_int
 
             replace_grad = {ufl.grad(t): ufl.dot(dt, Finv) for t, dt in zip(args_J, ref_grad)}
-            alpha = expand_derivatives(sum(ufl.diff(ufl.diff(ufl.replace(i.integrand(), replace_grad),
-                                                    ref_grad[0]), ref_grad[1]) for i in integrals_J))
+            alpha = expand_derivatives(ufl.diff(ufl.diff(ufl.replace(integrand_J, replace_grad),
+                                                         ref_grad[0]), ref_grad[1]))
             G = alpha
             G = ufl.as_tensor([[[G[i, k, j, k] for i in range(G.ufl_shape[0])] for j in range(G.ufl_shape[2])] for k in range(G.ufl_shape[3])])
             G = G * abs(ufl.JacobianDeterminant(mesh))
 
-            Q = FunctionSpace(mesh, ufl.TensorElement(DGT, shape=G.ufl_shape))
-            tensor = coefficients.setdefault("Gq_facet", Function(Q))
-            assembly_callables.append(OneFormAssembler(ifacet_inner(TestFunction(Q), G), tensor=tensor,
-                                                       form_compiler_parameters=fcp).assemble)
             PT = Piola.T
-            Q = FunctionSpace(mesh, ufl.TensorElement(DGT, shape=PT.ufl_shape))
-            tensor = coefficients.setdefault("PT_facet", Function(Q))
-            assembly_callables.append(OneFormAssembler(ifacet_inner(TestFunction(Q), PT), tensor=tensor,
+            # assemble both facet coefficients in a single sweep over the interior facets
+            QG = FunctionSpace(mesh, ufl.TensorElement(DGT, shape=G.ufl_shape))
+            QPT = FunctionSpace(mesh, ufl.TensorElement(DGT, shape=PT.ufl_shape))
+            Q = QG * QPT
+            tensor = Function(Q)
+            coefficients["Gq_facet"], coefficients["PT_facet"] = tensor.subfunctions
+            qG, qPT = TestFunctions(Q)
+            assembly_callables.append(OneFormAssembler(ifacet_inner(qG, G) + ifacet_inner(qPT, PT), tensor=tensor,
                                                        form_compiler_parameters=fcp).assemble)
 
         # make DGT functions with BC flags
@@ -1709,8 +1699,7 @@ class PoissonFDMPC(FDMPC):
                                                            form_compiler_parameters=fcp).assemble)
         # set arbitrary non-zero coefficients for preallocation
         for coef in coefficients.values():
-            with coef.dat.vec as cvec:
-                cvec.set(1.0E0)
+            coef.dat.data[:] = 1.0E0
         return coefficients, assembly_callables
 
 
@@ -1729,7 +1718,7 @@ def get_piola_tensor(mapping, domain):
 
 def pull_axis(x, pshape, idir):
     """permute x by reshaping into pshape and moving axis idir to the front"""
-    return numpy.reshape(numpy.moveaxis(numpy.reshape(x.copy(), pshape), idir, 0), x.shape)
+    return numpy.reshape(numpy.moveaxis(numpy.reshape(x, pshape), idir, 0), x.shape)
 
 
 def numpy_to_petsc(A_numpy, dense_indices, diag=True, block=False, comm=None):
@@ -1815,8 +1804,8 @@ def extrude_interior_facet_maps(V):
     :arg V: a :class:`.FunctionSpace`
 
     :returns: the 3-tuple of
-        facet_to_nodes_fun: maps interior facets to the nodes of the two cells sharing it,
-        local_facet_data_fun: maps interior facets to the local facet numbering in the two cells sharing it,
+        facet_to_nodes: a numpy array with the nodes of the two cells sharing each interior facet,
+        local_facet_data: a numpy array with the local facet numbering in the two cells sharing each interior facet,
         nfacets: the total number of interior facets owned by this process
     """
     if isinstance(V, Function):
@@ -1841,103 +1830,79 @@ def extrude_interior_facet_maps(V):
         nelv = cell_node_map.values.shape[0]
         layers = facet_node_map.iterset.layers_array
         itype = cell_offset.dtype
-        shift_h = numpy.array([[0], [1]], itype)
 
         if mesh.variable_layers:
-            nv = 0
-            to_base = []
-            to_layer = []
-            for f, cells in enumerate(facet_to_cells):
-                istart = max(layers[cells, 0])
-                iend = min(layers[cells, 1])
-                nz = iend-istart-1
-                nv += nz
-                to_base.append(numpy.full((nz,), f, itype))
-                to_layer.append(numpy.arange(nz, dtype=itype))
-
-            nh = layers[:, 1]-layers[:, 0]-2
-            to_base.append(numpy.repeat(numpy.arange(len(nh), dtype=itype), nh))
-            to_layer += [numpy.arange(nf, dtype=itype) for nf in nh]
-
-            to_base = numpy.concatenate(to_base)
-            to_layer = numpy.concatenate(to_layer)
-            nfacets = nv + sum(nh[:nelv])
-
-            local_facet_data_fun = lambda e: local_facet_data[to_base[e]] if e < nv else local_facet_data_h
-            facet_to_nodes_fun = lambda e: facet_to_nodes[to_base[e]] + to_layer[e]*facet_offset if e < nv else numpy.reshape(cell_to_nodes[to_base[e]] + numpy.kron(to_layer[e]+shift_h, cell_offset), (-1,))
+            istart = numpy.max(layers[facet_to_cells, 0], axis=1)
+            iend = numpy.min(layers[facet_to_cells, 1], axis=1)
+            nv = iend-istart-1
+            to_base_v = numpy.repeat(numpy.arange(len(nv), dtype=itype), nv)
+            to_layer_v = concatenate_ranges(nv, dtype=itype)
+
+            nh = layers[:nelv, 1]-layers[:nelv, 0]-2
+            to_base_h = numpy.repeat(numpy.arange(nelv, dtype=itype), nh)
+            to_layer_h = concatenate_ranges(nh, dtype=itype)
         else:
             nelz = layers[0, 1]-layers[0, 0]-1
-            nv = nbase * nelz
-            nh = nelv * (nelz-1)
-            nfacets = nv + nh
-
-            local_facet_data_fun = lambda e: local_facet_data[e//nelz] if e < nv else local_facet_data_h
-            facet_to_nodes_fun = lambda e: facet_to_nodes[e//nelz] + (e % nelz)*facet_offset if e < nv else numpy.reshape(cell_to_nodes[(e-nv)//(nelz-1)] + numpy.kron(((e-nv) % (nelz-1))+shift_h, cell_offset), (-1,))
+            to_base_v = numpy.repeat(numpy.arange(nbase, dtype=itype), nelz)
+            to_layer_v = numpy.tile(numpy.arange(nelz, dtype=itype), nbase)
+            to_base_h = numpy.repeat(numpy.arange(nelv, dtype=itype), nelz-1)
+            to_layer_h = numpy.tile(numpy.arange(nelz-1, dtype=itype), nelv)
+
+        # vertical facets, followed by the horizontal facets between two layers of cells
+        facet_to_nodes_v = facet_to_nodes[to_base_v] + numpy.multiply.outer(to_layer_v, facet_offset)
+        facet_to_nodes_h = cell_to_nodes[to_base_h] + numpy.multiply.outer(to_layer_h, cell_offset)
+        facet_to_nodes_h = numpy.concatenate((facet_to_nodes_h, facet_to_nodes_h + cell_offset), axis=1)
+        facet_to_nodes = numpy.concatenate((facet_to_nodes_v, facet_to_nodes_h))
+        local_facet_data = numpy.concatenate((local_facet_data[to_base_v],
+                                              numpy.tile(local_facet_data_h, (len(to_base_h), 1))))
+        nfacets = facet_to_nodes.shape[0]
     else:
-        facet_to_nodes_fun = lambda e: facet_to_nodes[e]
-        local_facet_data_fun = lambda e: local_facet_data[e]
         nfacets = nbase
 
-    return facet_to_nodes_fun, local_facet_data_fun, nfacets
+    return facet_to_nodes, local_facet_data, nfacets
 
 
-def extrude_node_map(node_map, bsize=1):
+def concatenate_ranges(sizes, dtype=PETSc.IntType):
+    """Return the concatenation of arange(n) for each n in sizes, without a Python loop"""
+    ranges = numpy.arange(numpy.sum(sizes), dtype=dtype)
+    ranges -= numpy.repeat(numpy.cumsum(sizes) - sizes, sizes).astype(dtype, copy=False)
+    return ranges
+
+
+def tabulate_node_map(node_map, bsize=1, horiz=False):
     """
-    Construct a (possibly vector-valued) cell to node map from an un-extruded scalar map.
+    Tabulate a (possibly vector-valued) cell to node map from an un-extruded scalar map.
 
     :arg node_map: a :class:`pyop2.Map` mapping entities to their local dofs, including ghost entities.
     :arg bsize: the block size
+    :arg horiz: are we tabulating the nodes of pairs of vertically adjacent cells?
 
-    :returns: a 2-tuple with the cell to node map and the number of cells owned by this process
+    :returns: a numpy array with the nodes of each entity owned by this process, one entity per row
     """
     nel = node_map.values.shape[0]
-    if node_map.offset is None:
-        def _scalar_map(map_values, e, result=None):
-            if result is None:
-                result = numpy.empty_like(map_values[e])
-            numpy.copyto(result, map_values[e])
-            return result
-
-        scalar_map = partial(_scalar_map, node_map.values_with_halo)
-    else:
+    table = node_map.values_with_halo[:nel]
+    if node_map.offset is not None:
+        offset = node_map.offset
+        if horiz:
+            table = numpy.concatenate((table, table + offset), axis=1)
+            offset = numpy.tile(offset, 2)
         layers = node_map.iterset.layers_array
-        if layers.shape[0] == 1:
-            def _scalar_map(map_values, offset, nelz, e, result=None):
-                if result is None:
-                    result = numpy.empty_like(offset)
-                numpy.copyto(result, offset)
-                result *= (e % nelz)
-                result += map_values[e // nelz]
-                return result
-
-            nelz = layers[0, 1]-layers[0, 0]-1
-            nel *= nelz
-            scalar_map = partial(_scalar_map, node_map.values_with_halo, node_map.offset, nelz)
+        nelz = layers[:, 1] - layers[:, 0] - (2 if horiz else 1)
+        if nelz.shape[0] == 1:
+            # Constant layers: broadcast the offsets of each layer over the base entities
+            nelz, = nelz
+            table = numpy.add(table[:, None, :], numpy.multiply.outer(numpy.arange(nelz, dtype=table.dtype), offset))
+            table = table.reshape((nel*nelz, -1))
         else:
-            def _scalar_map(map_values, offset, to_base, to_layer, e, result=None):
-                if result is None:
-                    result = numpy.empty_like(offset)
-                numpy.copyto(result, offset)
-                result *= to_layer[e]
-                result += map_values[to_base[e]]
-                return result
-
-            nelz = layers[:, 1]-layers[:, 0]-1
-            nel = sum(nelz[:nel])
-            to_base = numpy.repeat(numpy.arange(node_map.values_with_halo.shape[0], dtype=node_map.offset.dtype), nelz)
-            to_layer = numpy.concatenate([numpy.arange(nz, dtype=node_map.offset.dtype) for nz in nelz])
-            scalar_map = partial(_scalar_map, node_map.values_with_halo, node_map.offset, to_base, to_layer)
-
-    if bsize == 1:
-        return scalar_map, nel
-
-    def vector_map(bsize, ibase, e, result=None):
-        index = None
-        if result is not None:
-            index = result[:, 0]
-        index = scalar_map(e, result=index)
-        index *= bsize
-        return numpy.add.outer(index, ibase, out=result)
-
-    ibase = numpy.arange(bsize, dtype=node_map.values.dtype)
-    return partial(vector_map, bsize, ibase), nel
+            nelz = nelz[:nel]
+            # Layer index of each extruded entity, ordered by base entity and then by layer
+            layer = concatenate_ranges(nelz, dtype=table.dtype)
+            table = numpy.repeat(table, nelz, axis=0)
+            # Add the offsets one column at a time through a single column-sized buffer
+            shift = numpy.empty_like(layer)
+            for j, offset_j in enumerate(offset):
+                numpy.multiply(layer, offset_j, out=shift)
+                table[:, j] += shift
+    if bsize > 1:
+        table = numpy.add.outer(table * bsize, numpy.arange(bsize, dtype=table.dtype))
+    return numpy.reshape(table, (table.shape[0], -1)).astype(PETSc.IntType, copy=False)
@@ -104,6 +104,14 @@ def test_ensemble_allreduce(ensemble, mesh, W, urank, urank_sum, blocking):
     assert errornorm(urank_sum, u_reduce) < 1e-12
 
 
+@pytest.mark.parallel(nprocs=6)
+def test_ensemble_allreduce_in_place(ensemble, mesh, W, urank, urank_sum):
+    u = ensemble.allreduce(urank, urank)
+
+    assert u is urank
+    assert errornorm(urank_sum, urank) < 1e-12
+
+
 @pytest.mark.parallel(nprocs=2)
 @pytest.mark.parametrize("blocking", blocking)
 def test_comm_manager_allreduce(blocking):
@@ -314,6 +322,56 @@ def test_send_and_recv(ensemble, mesh, W, blocking):
         assert errornorm(urecv, usend) < 1e-12
 
 
+@pytest.mark.parallel(nprocs=6)
+def test_send_and_recv_mixed_blocking(ensemble, mesh, W):
+    ensemble_rank = ensemble.ensemble_comm.rank
+    ensemble_size = ensemble.ensemble_comm.size
+    rank0 = 0
+    rank1 = 1
+
+    usend = unique_function(mesh, ensemble_size, W)
+    urecv = Function(W).assign(0)
+
+    # blocking and nonblocking calls must agree on the message layout
+    if ensemble_rank == rank0:
+        ensemble.send(usend, dest=rank1, tag=rank0)
+        MPI.Request.Waitall(ensemble.irecv(urecv, source=rank1, tag=rank1))
+        assert errornorm(urecv, usend) < 1e-12
+
+    elif ensemble_rank == rank1:
+        ensemble.recv(urecv, source=rank0, tag=rank0)
+        MPI.Request.Waitall(ensemble.isend(usend, dest=rank0, tag=rank1))
+        assert errornorm(urecv, usend) < 1e-12
+
+
+@pytest.mark.parallel(nprocs=6)
+def test_send_init(ensemble, mesh, W):
+    ensemble_rank = ensemble.ensemble_comm.rank
+    ensemble_size = ensemble.ensemble_comm.size
+    rank0 = 0
+    rank1 = 1
+
+    usend = unique_function(mesh, ensemble_size, W)
+    uexpect = unique_function(mesh, ensemble_size, W)
+    urecv = Function(W)
+
+    # the same persistent requests send the updated values each time
+    if ensemble_rank == rank0:
+        send_requests = ensemble.send_init(usend, dest=rank1, tag=rank0)
+        for scale in (1, 2):
+            usend.assign(scale*uexpect)
+            MPI.Prequest.Startall(send_requests)
+            MPI.Request.Waitall(send_requests)
+        for request in send_requests:
+            request.Free()
+
+    elif ensemble_rank == rank1:
+        for scale in (1, 2):
+            urecv.assign(0)
+            MPI.Request.Waitall(ensemble.irecv(urecv, source=rank0, tag=rank0))
+            assert errornorm(scale*uexpect, urecv) < 1e-12
+
+
 @pytest.mark.parallel(nprocs=6)
 @pytest.mark.parametrize("blocking", blocking)
 def test_sendrecv(ensemble, mesh, W, urank, blocking):
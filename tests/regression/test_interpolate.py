@@ -273,6 +273,37 @@ def test_lvalue_rvalue():
     assert np.allclose(u.dat.data_ro, 2.0)
 
 
+def test_repeated_interpolate_into_function():
+    mesh = UnitSquareMesh(10, 10)
+    V = FunctionSpace(mesh, "CG", 1)
+    x, y = SpatialCoordinate(mesh)
+    c = Constant(1.0)
+    u = Function(V)
+    for i in range(3):
+        c.assign(i)
+        u.interpolate(c*x)
+        assert np.allclose(u.dat.data_ro, i*interpolate(x, V).dat.data_ro)
+    u.interpolate(u + 1.0)
+    u.interpolate(u + 1.0)
+    assert np.allclose(u.dat.data_ro, 2*interpolate(x, V).dat.data_ro + 2.0)
+
+
+def test_interpolate_does_not_keep_temporaries_alive():
+    import gc
+    import weakref
+    mesh = UnitSquareMesh(10, 10)
+    V = FunctionSpace(mesh, "CG", 1)
+    x, y = SpatialCoordinate(mesh)
+    u = Function(V)
+    tmp = Function(V).interpolate(x)
+    ref = weakref.ref(tmp)
+    u.interpolate(tmp)
+    del tmp
+    gc.collect()
+    assert ref() is None
+    assert np.allclose(u.dat.data_ro, interpolate(x, V).dat.data_ro)
+
+
 @pytest.mark.parametrize("degree", range(1, 4))
 def test_interpolator_Pk(degree):
     mesh = UnitSquareMesh(10, 10, quadrilateral=False)
@@ -26,3 +26,13 @@ def test_int_type():
     actual = {4: "int32", 8: "int64"}[IntType.itemsize]
 
     assert expected == actual
+
+
+def test_matplotlib_is_imported_lazily():
+    import subprocess
+    import sys
+    code = ("import sys; "
+            "from firedrake import *; "
+            "assert callable(tripcolor); "
+            "assert 'matplotlib' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)